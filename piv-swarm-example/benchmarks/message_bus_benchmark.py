@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark the IPC message bus across processes.
+
+One orchestrator process runs the broker and assigns tasks to N executor
+processes. Every ``task_assignment`` is acknowledged, and each executor answers
+with acknowledged ``task_started`` and ``task_completed`` messages, so every
+task is three acked messages crossing process boundaries.
+
+Reports:
+- Messages per second for the full assignment/started/completed cycle
+- Ack round-trip latency (p50/p95/p99) for task_assignment
+
+Usage:
+    uv run python benchmarks/message_bus_benchmark.py
+    uv run python benchmarks/message_bus_benchmark.py --executors 3 --tasks 2000
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.synchronize import Event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.services.message_bus import (  # noqa: E402
+    BusConfig,
+    MessageBroker,
+    MessageBusClient,
+)
+
+ORCHESTRATOR = "orchestrator"
+# Short timeouts so a stalled executor fails the run quickly instead of
+# retrying for minutes with the 30s messages.yaml default.
+BENCH_CONFIG = BusConfig(delivery_timeout=5.0, retry_count=1)
+REPLY_TIMEOUT = 30.0
+
+
+def run_executor(path: str, agent_id: str, ready: Event) -> None:
+    """Executor process: acknowledge assignments and report completion."""
+    with MessageBusClient(path, agent_id, BENCH_CONFIG) as client:
+        # connect() returns once the broker has registered us, so the
+        # orchestrator can start assigning as soon as this is set.
+        ready.set()
+        while True:
+            message = client.receive()
+            if message is None or message.type == "shutdown":
+                return
+            if message.type == "task_assignment":
+                client.send(ORCHESTRATOR, "task_started", task_id=message.task_id)
+                client.send(ORCHESTRATOR, "task_completed", task_id=message.task_id)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--executors", type=int, default=2, help="executor processes")
+    parser.add_argument("--tasks", type=int, default=1000, help="tasks per executor")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory(prefix="piv-bus-")
+    path = os.path.join(tmpdir.name, "bus.sock")
+    executor_ids = [f"executor-{i + 1}" for i in range(args.executors)]
+    latencies: dict[str, list[float]] = {agent: [] for agent in executor_ids}
+
+    print("=" * 70)
+    print("PIV-Swarm Message Bus Benchmark")
+    print("=" * 70)
+    print(f"   Socket: {path}")
+    print(f"   Executors: {args.executors}, tasks per executor: {args.tasks}\n")
+
+    with MessageBroker(path), MessageBusClient(
+        path, ORCHESTRATOR, BENCH_CONFIG
+    ) as orchestrator:
+        ctx = mp.get_context("spawn")
+        processes = []
+        for agent_id in executor_ids:
+            ready = ctx.Event()
+            process = ctx.Process(target=run_executor, args=(path, agent_id, ready))
+            process.start()
+            ready.wait()
+            processes.append(process)
+
+        def assign(agent_id: str) -> None:
+            for i in range(args.tasks):
+                start = time.perf_counter()
+                orchestrator.send(agent_id, "task_assignment", task_id=f"{agent_id}-task-{i}")
+                latencies[agent_id].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        assigners = [
+            threading.Thread(target=assign, args=(a,), daemon=True) for a in executor_ids
+        ]
+        for thread in assigners:
+            thread.start()
+
+        expected = 2 * args.executors * args.tasks
+        received = 0
+        while received < expected:
+            if orchestrator.receive(timeout=REPLY_TIMEOUT) is None:
+                print(f"❌ Timed out after {received}/{expected} replies")
+                break
+            received += 1
+        for thread in assigners:
+            thread.join(timeout=REPLY_TIMEOUT)
+        elapsed = time.perf_counter() - start
+
+        for agent_id in executor_ids:
+            orchestrator.send(agent_id, "shutdown", require_ack=False)
+        for process in processes:
+            process.join(timeout=5.0)
+    tmpdir.cleanup()
+
+    total_messages = args.executors * args.tasks + received
+    samples = [s * 1e6 for agent in executor_ids for s in latencies[agent]]
+
+    print("📊 Results")
+    print("-" * 70)
+    print(f"   Messages delivered: {total_messages:,} in {elapsed:.2f}s")
+    if elapsed > 0:
+        print(f"   Throughput: {total_messages / elapsed:,.0f} msg/s (acked)")
+    print(f"   Retries: {orchestrator.retries}")
+    print("\n⏱️  task_assignment ack latency:")
+    if not samples:
+        print("   no acknowledged task_assignment messages")
+        return
+    print(f"   mean: {statistics.fmean(samples):,.1f} µs")
+    for pct in (50, 95, 99):
+        print(f"   p{pct}:  {percentile(samples, pct):,.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,562 @@
+"""Local IPC message bus for multi-process swarm agents.
+
+Messages use the same shape as the entries in ``.agents/state/messages.yaml``
+(``id``, ``timestamp``, ``from``, ``to``, ``type``, ``content``, ``task_id``,
+``metadata``, ``acknowledged``) and travel as length-prefixed JSON frames over a
+Unix domain socket.
+
+A :class:`MessageBroker` owns the socket and routes frames between connected
+agents. Each agent process (orchestrator, ``executor-1``, ``researcher-1``, ...)
+connects with a :class:`MessageBusClient`. ``send()`` waits for the recipient to
+acknowledge the message, retrying up to ``retry_count`` times with a
+``delivery_timeout`` per attempt, matching the ``config`` block of
+``messages.yaml``. Receivers acknowledge automatically and drop retried
+duplicates, so each message is handed to the application once. The broker
+answers messages for agents that are not connected with a ``nack`` so the
+sender fails immediately instead of waiting out every retry.
+
+Every socket is written by its own writer thread fed from a queue. Readers
+never block on another peer's socket, so agents sending to each other at the
+same time cannot deadlock on full socket buffers.
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import os
+import queue
+import socket
+import stat
+import struct
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+BROADCAST = "all"
+ACK_TYPE = "ack"
+NACK_TYPE = "nack"
+REGISTER_TYPE = "register"
+REGISTERED_TYPE = "registered"
+BROKER_ID = "broker"
+
+# Defaults mirror the ``config`` block in .agents/state/messages.yaml.
+DEFAULT_DELIVERY_TIMEOUT = 30.0
+DEFAULT_RETRY_COUNT = 3
+DEFAULT_MAX_MESSAGES = 1000
+
+_HEADER = struct.Struct("!I")
+_MAX_FRAME = 16 * 1024 * 1024
+
+
+class MessageBusError(Exception):
+    """Base error for message bus failures."""
+
+
+class DeliveryError(MessageBusError):
+    """Raised when a message is not acknowledged after all retries."""
+
+
+@dataclass(frozen=True)
+class BusConfig:
+    """Delivery settings shared by broker clients."""
+
+    delivery_timeout: float = DEFAULT_DELIVERY_TIMEOUT
+    retry_count: int = DEFAULT_RETRY_COUNT
+    # Received ids remembered for dropping retried duplicates.
+    max_messages: int = DEFAULT_MAX_MESSAGES
+
+
+@dataclass(frozen=True)
+class Message:
+    """A single agent-to-agent message."""
+
+    id: str
+    sender: str
+    recipient: str
+    type: str
+    content: str = ""
+    task_id: str | None = None
+    metadata: dict[str, Any] | None = None
+    timestamp: str = field(
+        default_factory=lambda: datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    )
+    acknowledged: bool = False
+    require_ack: bool = True
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize using the field names from messages.yaml."""
+        return {
+            "id": self.id,
+            "timestamp": self.timestamp,
+            "from": self.sender,
+            "to": self.recipient,
+            "type": self.type,
+            "content": self.content,
+            "task_id": self.task_id,
+            "metadata": self.metadata,
+            "acknowledged": self.acknowledged,
+            "require_ack": self.require_ack,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Message:
+        """Build a message from its messages.yaml representation."""
+        return cls(
+            id=data["id"],
+            sender=data["from"],
+            recipient=data["to"],
+            type=data["type"],
+            content=data.get("content") or "",
+            task_id=data.get("task_id"),
+            metadata=data.get("metadata"),
+            timestamp=data["timestamp"],
+            acknowledged=bool(data.get("acknowledged", False)),
+            require_ack=bool(data.get("require_ack", True)),
+        )
+
+
+def _encode(data: dict[str, Any]) -> bytes:
+    payload = json.dumps(data, separators=(",", ":")).encode()
+    return _HEADER.pack(len(payload)) + payload
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes | None:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def _read_frame(sock: socket.socket) -> dict[str, Any] | None:
+    """Read one frame, returning None when the peer has closed the socket."""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > _MAX_FRAME:
+        raise MessageBusError(f"Frame of {size} bytes exceeds limit of {_MAX_FRAME}")
+    payload = _recv_exact(sock, size)
+    if payload is None:
+        return None
+    frame: dict[str, Any] = json.loads(payload)
+    return frame
+
+
+class _Writer:
+    """Drains a queue of frames onto a socket from a dedicated thread.
+
+    ``put()`` never blocks, so a reader thread can reply (acks, nacks,
+    routed frames) without waiting on a peer that has stopped reading.
+    """
+
+    def __init__(self, sock: socket.socket, name: str) -> None:
+        self._sock = sock
+        self._queue: queue.Queue[bytes | None] = queue.Queue()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, frame: bytes) -> None:
+        if self._closed.is_set():
+            raise MessageBusError("Connection is closed")
+        self._queue.put(frame)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop after flushing queued frames, waiting up to ``timeout``."""
+        self._closed.set()
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            try:
+                self._sock.sendall(frame)
+            except OSError:
+                self._closed.set()
+                return
+
+
+class _Peer:
+    """Broker-side connection to one agent."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.agent_id: str | None = None
+        self.writer = _Writer(sock, "broker-writer")
+
+    def send(self, data: dict[str, Any]) -> None:
+        try:
+            self.writer.put(_encode(data))
+        except MessageBusError:
+            pass
+
+
+class MessageBroker:
+    """Routes messages between agents connected to a Unix domain socket.
+
+    Messages addressed to ``"all"`` are broadcast to every other agent.
+    Messages for an agent that is not connected are answered with a
+    ``nack`` so the sender's ``send()`` fails right away.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._peers: dict[str, _Peer] = {}
+        self._lock = threading.Lock()
+        self._server: socket.socket | None = None
+        self._threads: list[threading.Thread] = []
+        self._closed = threading.Event()
+
+    def start(self) -> MessageBroker:
+        """Bind the socket and start accepting agent connections.
+
+        Raises:
+            MessageBusError: If ``path`` is not a socket, or another broker
+                is still listening on it.
+        """
+        self._remove_stale_socket()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        server.listen()
+        self._server = server
+        self._spawn(self._accept_loop)
+        return self
+
+    def close(self) -> None:
+        """Stop accepting connections and disconnect every agent."""
+        self._closed.set()
+        if self._server is None:
+            return
+        try:
+            self._server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._server.close()
+        with self._lock:
+            peers = list(self._peers.values())
+            self._peers.clear()
+            threads = list(self._threads)
+        for peer in peers:
+            peer.writer.close(timeout=0)
+            try:
+                peer.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            peer.sock.close()
+        for thread in threads:
+            thread.join(timeout=1.0)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = None
+
+    def connected_agents(self) -> list[str]:
+        """Return the ids of all registered agents."""
+        with self._lock:
+            return sorted(self._peers)
+
+    def __enter__(self) -> MessageBroker:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _remove_stale_socket(self) -> None:
+        try:
+            mode = os.stat(self.path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise MessageBusError(f"{self.path} exists and is not a socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Left behind by a broker that exited without cleaning up.
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            return
+        finally:
+            probe.close()
+        raise MessageBusError(f"A broker is already listening on {self.path}")
+
+    def _spawn(self, target: Any, *args: Any) -> None:
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            self._threads.append(thread)
+
+    def _accept_loop(self) -> None:
+        assert self._server is not None
+        while not self._closed.is_set():
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                return
+            self._spawn(self._serve, _Peer(sock))
+
+    def _serve(self, peer: _Peer) -> None:
+        try:
+            while True:
+                frame = _read_frame(peer.sock)
+                if frame is None:
+                    return
+                if frame.get("type") == REGISTER_TYPE:
+                    peer.agent_id = str(frame["from"])
+                    with self._lock:
+                        self._peers[peer.agent_id] = peer
+                    peer.send({"type": REGISTERED_TYPE, "from": BROKER_ID, "to": peer.agent_id})
+                    continue
+                self._route(frame, peer)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError, MessageBusError):
+            return
+        finally:
+            if peer.agent_id is not None:
+                with self._lock:
+                    if self._peers.get(peer.agent_id) is peer:
+                        del self._peers[peer.agent_id]
+            peer.writer.close(timeout=0)
+            peer.sock.close()
+
+    def _route(self, frame: dict[str, Any], sender: _Peer) -> None:
+        recipient = frame.get("to")
+        with self._lock:
+            if recipient == BROADCAST:
+                targets = [p for p in self._peers.values() if p is not sender]
+            else:
+                target = self._peers.get(str(recipient))
+                targets = [target] if target is not None else []
+        for target in targets:
+            target.send(frame)
+
+        if (
+            not targets
+            and recipient != BROADCAST
+            and frame.get("type") not in (ACK_TYPE, NACK_TYPE)
+            and "id" in frame
+            and sender.agent_id is not None
+        ):
+            nack = Message(
+                id=f"nack-{frame['id']}",
+                sender=BROKER_ID,
+                recipient=sender.agent_id,
+                type=NACK_TYPE,
+                metadata={
+                    "in_response_to": frame["id"],
+                    "reason": f"{recipient} is not connected",
+                },
+                require_ack=False,
+            )
+            sender.send(nack.to_dict())
+
+
+class _Delivery:
+    """Outcome of one acked send: set on ack, or on nack with ``error``."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.error: str | None = None
+
+
+class MessageBusClient:
+    """An agent's connection to the :class:`MessageBroker`."""
+
+    def __init__(self, path: str, agent_id: str, config: BusConfig | None = None) -> None:
+        self.path = path
+        self.agent_id = agent_id
+        self.config = config or BusConfig()
+        self._sock: socket.socket | None = None
+        self._writer: _Writer | None = None
+        self._inbox: queue.Queue[Message] = queue.Queue()
+        self._pending: dict[str, _Delivery] = {}
+        self._pending_lock = threading.Lock()
+        self._registered = threading.Event()
+        self._seen: OrderedDict[str, None] = OrderedDict()
+        self._counter = itertools.count(1)
+        self._nonce = uuid.uuid4().hex[:8]
+        self._reader: threading.Thread | None = None
+        self.retries = 0
+
+    def connect(self) -> MessageBusClient:
+        """Connect to the broker and wait until it confirms this agent id.
+
+        Raises:
+            MessageBusError: If the broker does not confirm registration
+                within ``delivery_timeout``.
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        self._sock = sock
+        # Ids restart per connection, so a reconnecting agent never reuses
+        # an id the receiver already treats as a duplicate.
+        self._nonce = uuid.uuid4().hex[:8]
+        self._counter = itertools.count(1)
+        self._registered.clear()
+        self._writer = _Writer(sock, f"{self.agent_id}-writer")
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+        self._write({"type": REGISTER_TYPE, "from": self.agent_id})
+        if not self._registered.wait(self.config.delivery_timeout):
+            self.close()
+            raise MessageBusError(f"Broker did not confirm registration of {self.agent_id}")
+        return self
+
+    def close(self) -> None:
+        """Flush queued frames and disconnect from the broker."""
+        if self._sock is None:
+            return
+        if self._writer is not None:
+            self._writer.close(timeout=1.0)
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        if self._reader is not None:
+            self._reader.join(timeout=1.0)
+        self._sock = None
+        self._writer = None
+
+    def __enter__(self) -> MessageBusClient:
+        return self.connect()
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def send(
+        self,
+        to: str,
+        type: str,
+        content: str = "",
+        task_id: str | None = None,
+        metadata: dict[str, Any] | None = None,
+        require_ack: bool = True,
+    ) -> Message:
+        """Send a message, blocking until it is acknowledged.
+
+        Broadcasts (``to="all"``) and ``require_ack=False`` sends return
+        immediately without waiting for an ack, so their delivery is not
+        guaranteed: agents that are not connected simply miss them.
+
+        Raises:
+            DeliveryError: If the recipient is not connected, the connection
+                is closed, or no ack arrives within ``delivery_timeout`` after
+                the initial attempt and ``retry_count`` retries.
+        """
+        require_ack = require_ack and to != BROADCAST
+        message = Message(
+            id=f"msg-{self.agent_id}-{self._nonce}-{next(self._counter):06d}",
+            sender=self.agent_id,
+            recipient=to,
+            type=type,
+            content=content,
+            task_id=task_id,
+            metadata=metadata,
+            require_ack=require_ack,
+        )
+        if not require_ack:
+            self._write(message.to_dict())
+            return message
+
+        delivery = _Delivery()
+        with self._pending_lock:
+            self._pending[message.id] = delivery
+        try:
+            for attempt in range(self.config.retry_count + 1):
+                if attempt:
+                    with self._pending_lock:
+                        self.retries += 1
+                try:
+                    self._write(message.to_dict())
+                except MessageBusError as exc:
+                    raise DeliveryError(f"{message.id} ({type}) to {to}: {exc}") from exc
+                if not delivery.done.wait(self.config.delivery_timeout):
+                    continue
+                if delivery.error is not None:
+                    raise DeliveryError(f"{message.id} ({type}) rejected: {delivery.error}")
+                return Message.from_dict({**message.to_dict(), "acknowledged": True})
+        finally:
+            with self._pending_lock:
+                self._pending.pop(message.id, None)
+        raise DeliveryError(
+            f"{message.id} ({type}) to {to} not acknowledged after "
+            f"{self.config.retry_count + 1} attempts"
+        )
+
+    def receive(self, timeout: float | None = None) -> Message | None:
+        """Return the next incoming message, or None if ``timeout`` expires."""
+        try:
+            return self._inbox.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _write(self, data: dict[str, Any]) -> None:
+        """Queue a frame for the writer thread; never blocks on the socket."""
+        if self._writer is None:
+            raise MessageBusError(f"{self.agent_id} is not connected")
+        self._writer.put(_encode(data))
+
+    def _read_loop(self) -> None:
+        assert self._sock is not None
+        while True:
+            try:
+                frame = _read_frame(self._sock)
+            except (OSError, ValueError, MessageBusError):
+                return
+            if frame is None:
+                return
+            try:
+                self._handle(frame)
+            except (KeyError, TypeError, ValueError) as exc:
+                logger.warning("%s dropped malformed frame %r: %s", self.agent_id, frame, exc)
+
+    def _handle(self, frame: dict[str, Any]) -> None:
+        if frame["type"] == REGISTERED_TYPE:
+            self._registered.set()
+            return
+        if frame["type"] in (ACK_TYPE, NACK_TYPE):
+            with self._pending_lock:
+                delivery = self._pending.get(frame["metadata"]["in_response_to"])
+            if delivery is not None:
+                if frame["type"] == NACK_TYPE:
+                    delivery.error = str(frame["metadata"].get("reason", "rejected"))
+                delivery.done.set()
+            return
+
+        message = Message.from_dict(frame)
+        if message.require_ack and message.recipient != BROADCAST:
+            self._ack(message)
+        if message.id in self._seen:
+            return
+        self._seen[message.id] = None
+        if len(self._seen) > self.config.max_messages:
+            self._seen.popitem(last=False)
+        self._inbox.put(message)
+
+    def _ack(self, message: Message) -> None:
+        ack = Message(
+            id=f"ack-{message.id}",
+            sender=self.agent_id,
+            recipient=message.sender,
+            type=ACK_TYPE,
+            task_id=message.task_id,
+            metadata={"in_response_to": message.id},
+            acknowledged=True,
+            require_ack=False,
+        )
+        try:
+            self._write(ack.to_dict())
+        except MessageBusError:
+            pass
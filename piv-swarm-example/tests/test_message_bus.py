@@ -0,0 +1,243 @@
+"""Tests for the IPC message bus."""
+import multiprocessing as mp
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from src.services.message_bus import (
+    BusConfig,
+    DeliveryError,
+    Message,
+    MessageBroker,
+    MessageBusClient,
+    MessageBusError,
+    _encode,
+)
+
+
+@pytest.fixture
+def bus_path() -> Iterator[str]:
+    # tmp_path can exceed the 108 byte AF_UNIX path limit, so use a short dir.
+    with tempfile.TemporaryDirectory(prefix="bus-") as tmpdir:
+        yield os.path.join(tmpdir, "bus.sock")
+
+
+@pytest.fixture
+def broker(bus_path: str) -> Iterator[MessageBroker]:
+    with MessageBroker(bus_path) as broker:
+        yield broker
+
+
+def wait_for_agents(broker: MessageBroker, *agents: str) -> None:
+    for _ in range(200):
+        if set(agents) <= set(broker.connected_agents()):
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"agents never registered: {agents}")
+
+
+def echo_executor(path: str, agent_id: str) -> None:
+    with MessageBusClient(path, agent_id) as client:
+        message = client.receive(timeout=10.0)
+        assert message is not None
+        client.send(message.sender, "task_completed", task_id=message.task_id)
+
+
+def test_message_round_trips_messages_yaml_format() -> None:
+    message = Message(
+        id="msg-000001",
+        sender="orchestrator",
+        recipient="executor-1",
+        type="task_assignment",
+        task_id="task-001",
+        metadata={"priority": "high"},
+    )
+    data = message.to_dict()
+    assert data["from"] == "orchestrator"
+    assert data["to"] == "executor-1"
+    assert Message.from_dict(data) == message
+
+
+def test_send_is_acknowledged_and_received(broker: MessageBroker, bus_path: str) -> None:
+    with MessageBusClient(bus_path, "orchestrator") as orch, MessageBusClient(
+        bus_path, "executor-1"
+    ) as executor:
+        wait_for_agents(broker, "orchestrator", "executor-1")
+        sent = orch.send("executor-1", "task_assignment", "Do task-001", task_id="task-001")
+        received = executor.receive(timeout=1.0)
+
+    assert sent.acknowledged
+    assert received is not None
+    assert received.id == sent.id
+    assert received.type == "task_assignment"
+    assert received.task_id == "task-001"
+
+
+def test_unknown_recipient_fails_fast(broker: MessageBroker, bus_path: str) -> None:
+    with MessageBusClient(bus_path, "orchestrator") as orch:
+        start = time.monotonic()
+        with pytest.raises(DeliveryError, match="executor-9 is not connected"):
+            orch.send("executor-9", "task_assignment")
+        assert time.monotonic() - start < 1.0
+        assert orch.retries == 0
+
+
+def test_unacknowledged_send_raises_after_retries(broker: MessageBroker, bus_path: str) -> None:
+    silent = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    silent.connect(bus_path)
+    silent.sendall(_encode({"type": "register", "from": "executor-9"}))
+    wait_for_agents(broker, "executor-9")
+
+    config = BusConfig(delivery_timeout=0.05, retry_count=2)
+    with MessageBusClient(bus_path, "orchestrator", config) as orch:
+        with pytest.raises(DeliveryError, match="after 3 attempts"):
+            orch.send("executor-9", "task_assignment")
+        assert orch.retries == 2
+    silent.close()
+
+
+def test_send_right_after_connect_is_delivered(broker: MessageBroker, bus_path: str) -> None:
+    with MessageBusClient(bus_path, "orchestrator") as orch, MessageBusClient(
+        bus_path, "executor-1"
+    ) as executor:
+        orch.send("executor-1", "task_assignment", task_id="task-001")
+        assert executor.receive(timeout=1.0) is not None
+
+
+def test_simultaneous_bidirectional_sends_do_not_deadlock(
+    broker: MessageBroker, bus_path: str
+) -> None:
+    payload = "x" * 60_000
+    count = 300
+    with MessageBusClient(bus_path, "orchestrator") as orch, MessageBusClient(
+        bus_path, "executor-1"
+    ) as executor:
+        wait_for_agents(broker, "orchestrator", "executor-1")
+
+        def flood(client: MessageBusClient, to: str) -> None:
+            for _ in range(count):
+                client.send(to, "status_update", payload, require_ack=False)
+
+        senders = [
+            threading.Thread(target=flood, args=(orch, "executor-1"), daemon=True),
+            threading.Thread(target=flood, args=(executor, "orchestrator"), daemon=True),
+        ]
+        for thread in senders:
+            thread.start()
+        for client in (orch, executor):
+            for _ in range(count):
+                assert client.receive(timeout=10.0) is not None
+        for thread in senders:
+            thread.join(timeout=10.0)
+            assert not thread.is_alive()
+
+        assert orch.send("executor-1", "task_assignment").acknowledged
+        assert executor.receive(timeout=1.0) is not None
+
+
+def test_start_refuses_regular_file(bus_path: str) -> None:
+    with open(bus_path, "w") as f:
+        f.write("not a socket")
+    with pytest.raises(MessageBusError, match="not a socket"):
+        MessageBroker(bus_path).start()
+    assert os.path.isfile(bus_path)
+
+
+def test_start_refuses_live_broker(broker: MessageBroker, bus_path: str) -> None:
+    with pytest.raises(MessageBusError, match="already listening"):
+        MessageBroker(bus_path).start()
+    with MessageBusClient(bus_path, "orchestrator"):
+        assert broker.connected_agents() == ["orchestrator"]
+
+
+def test_start_replaces_stale_socket(bus_path: str) -> None:
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(bus_path)
+    stale.close()
+    with MessageBroker(bus_path), MessageBusClient(bus_path, "orchestrator") as orch:
+        assert orch.agent_id == "orchestrator"
+
+
+def test_duplicate_deliveries_are_dropped(broker: MessageBroker, bus_path: str) -> None:
+    with MessageBusClient(bus_path, "orchestrator") as orch, MessageBusClient(
+        bus_path, "executor-1"
+    ) as executor:
+        wait_for_agents(broker, "orchestrator", "executor-1")
+        message = Message(id="msg-dup", sender="orchestrator", recipient="executor-1", type="x")
+        orch._write(message.to_dict())
+        orch._write(message.to_dict())
+
+        assert executor.receive(timeout=1.0) == message
+        assert executor.receive(timeout=0.1) is None
+
+
+def test_reconnected_agent_messages_are_not_dropped(
+    broker: MessageBroker, bus_path: str
+) -> None:
+    with MessageBusClient(bus_path, "orchestrator") as orch:
+        for _ in range(2):
+            with MessageBusClient(bus_path, "executor-1") as executor:
+                wait_for_agents(broker, "orchestrator", "executor-1")
+                executor.send("orchestrator", "task_completed", task_id="task-001")
+            assert orch.receive(timeout=1.0) is not None
+
+
+def test_malformed_frame_does_not_kill_reader(broker: MessageBroker, bus_path: str) -> None:
+    with MessageBusClient(bus_path, "orchestrator") as orch, MessageBusClient(
+        bus_path, "executor-1"
+    ) as executor:
+        wait_for_agents(broker, "orchestrator", "executor-1")
+        orch._write({"type": "task_assignment", "from": "orchestrator", "to": "executor-1"})
+        sent = orch.send("executor-1", "task_assignment", task_id="task-001")
+
+        assert sent.acknowledged
+        received = executor.receive(timeout=1.0)
+        assert received is not None
+        assert received.id == sent.id
+
+
+def test_duplicate_tracking_is_bounded(broker: MessageBroker, bus_path: str) -> None:
+    config = BusConfig(max_messages=5)
+    with MessageBusClient(bus_path, "orchestrator") as orch, MessageBusClient(
+        bus_path, "executor-1", config
+    ) as executor:
+        wait_for_agents(broker, "orchestrator", "executor-1")
+        for _ in range(20):
+            orch.send("executor-1", "status_update")
+        assert len(executor._seen) == 5
+
+
+def test_broadcast_reaches_all_other_agents(broker: MessageBroker, bus_path: str) -> None:
+    with MessageBusClient(bus_path, "orchestrator") as orch, MessageBusClient(
+        bus_path, "executor-1"
+    ) as ex1, MessageBusClient(bus_path, "executor-2") as ex2:
+        wait_for_agents(broker, "orchestrator", "executor-1", "executor-2")
+        orch.send("all", "session_start", "Starting session")
+
+        for client in (ex1, ex2):
+            message = client.receive(timeout=1.0)
+            assert message is not None
+            assert message.type == "session_start"
+        assert orch.receive(timeout=0.1) is None
+
+
+def test_cross_process_task_cycle(broker: MessageBroker, bus_path: str) -> None:
+    with MessageBusClient(bus_path, "orchestrator") as orch:
+        process = mp.get_context("spawn").Process(
+            target=echo_executor, args=(bus_path, "executor-1")
+        )
+        process.start()
+        wait_for_agents(broker, "executor-1")
+        orch.send("executor-1", "task_assignment", task_id="task-001")
+        reply = orch.receive(timeout=10.0)
+        process.join(timeout=10.0)
+
+    assert process.exitcode == 0
+    assert reply is not None
+    assert reply.type == "task_completed"
+    assert reply.task_id == "task-001"